@@ -6,9 +6,25 @@ This module relies on the US Census API, which
 it wraps in a pythonic manner.
 """
 
+import threading
 import warnings
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import product
 from logging import getLogger
-from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 from dataclasses import dataclass
 
 import geopandas as gpd
@@ -62,6 +78,39 @@ def _gf2s(geo_filter: GeoFilterType) -> Optional[str]:
     return ",".join(geo_filter)
 
 
+_MAX_GEO_FILTER_VALUES = 500
+"""
+The maximum number of values of a geographic filter we put in one census API query.
+
+Unlike :py:data:`~_MAX_VARIABLES_PER_DOWNLOAD`, this is our limit, not
+one the U.S. Census documents. It keeps the URLs of our queries to a
+length servers will accept. When a filter has more values than this,
+:py:func:`~download` splits them up over multiple queries and
+concatenates the results.
+"""
+
+
+def _gf2s_chunks(geo_filter: GeoFilterType) -> List[Optional[str]]:
+    """
+    Utility to convert a filter to one or more strings.
+
+    Like :py:func:`~_gf2s`, except that filters with more
+    than :py:data:`~_MAX_GEO_FILTER_VALUES` values are broken
+    up into multiple strings, each of which can be used in
+    a separate query.
+    """
+    if geo_filter is None or isinstance(geo_filter, str):
+        return [geo_filter]
+
+    geo_filter = list(geo_filter)
+
+    return [
+        # black and flake8 disagree about the whitespace before ':' here...
+        _gf2s(geo_filter[start : start + _MAX_GEO_FILTER_VALUES])  # noqa: 203
+        for start in range(0, max(len(geo_filter), 1), _MAX_GEO_FILTER_VALUES)
+    ]
+
+
 _MAX_VARIABLES_PER_DOWNLOAD = 50
 """
 The maximum number of variables we can ask for in one census API query.
@@ -75,6 +124,30 @@ together be either merging or concatenation. This is all handled in
 """
 
 
+_MAX_CONCURRENT_DOWNLOADS = 8
+"""
+The maximum number of census API queries we will make concurrently.
+
+When :py:func:`~_download_multiple` breaks a request up into
+multiple calls to the census API, it makes up to this many of
+them at the same time. So does :py:func:`~download` when it breaks
+up long geographic filters. Since one may be inside the other, the
+limit is shared by all of them; see `__download_slots`.
+
+:py:func:`~add_inferred_geography` also fetches and reads no more
+than this many shapefiles at the same time.
+"""
+
+__download_slots = threading.BoundedSemaphore(_MAX_CONCURRENT_DOWNLOADS)
+"""
+Every query for data from the census API holds one of these while it runs.
+
+This keeps the total number of concurrent queries within
+:py:data:`~_MAX_CONCURRENT_DOWNLOADS`, and within the connection pool
+they share, even when thread pools are nested.
+"""
+
+
 __dw_strategy_metrics = {"merge": 0, "concat": 0}
 """
 Counters for how often we use each strategy for wide tables.
@@ -101,6 +174,7 @@ def _download_multiple(
     key: Optional[str],
     census_variables: "VariableCache",
     with_geometry: bool = False,
+    downcast: bool = False,
     **kwargs: cgeo.InSpecType,
 ) -> pd.DataFrame:
     """
@@ -127,6 +201,9 @@ def _download_multiple(
         a map. See https://www.census.gov/geographies/mapping-files/time-series/geo/cartographic-boundary.2020.html
         for details of the shapefiles that will be downloaded on your behalf to
         generate these boundaries.
+    downcast
+        If `True`, store each numeric variable in the smallest type that can
+        hold its values. See :py:func:`~download`.
     api_key
         An optional API key. If you don't have or don't use a key, the number
         of calls you can make will be limited.
@@ -154,31 +231,36 @@ def _download_multiple(
             "use download instead."
         )
 
-    # Get the data for each chunk.
-    dfs = [
-        download(
+    # Get the data for each chunk. Each is a separate call to
+    # the census API, so we make them concurrently.
+    def download_group(ii: int, variable_group: List[str]) -> pd.DataFrame:
+        return download(
             dataset,
             vintage,
             variable_group,
             api_key=key,
             variable_cache=census_variables,
             with_geometry=with_geometry and (ii == 0),
+            downcast=downcast,
             **kwargs,
         )
-        for ii, variable_group in enumerate(variable_groups)
-    ]
+
+    with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_DOWNLOADS) as executor:
+        dfs = list(
+            executor.map(download_group, range(len(variable_groups)), variable_groups)
+        )
 
     # What variables came back in the first df but were not
     # requested? These are a key to the geography the row
     # represents. For example, 'STATE' amd 'COUNTY' might
     # be these variables if we did a county-level query to
-    # the census API.
-    geo_key_variables = [f for f in dfs[0].columns if f not in set(variable_groups[0])]
-
-    # If we put in the geometry column, it's not part of the
-    # key.
+    # the census API. If we put in the geometry column, it's
+    # not part of the key.
+    not_geo_key_variables = frozenset(variable_groups[0])
     if with_geometry:
-        geo_key_variables = [f for f in geo_key_variables if f != "geometry"]
+        not_geo_key_variables = not_geo_key_variables | {"geometry"}
+
+    geo_key_variables = [f for f in dfs[0].columns if f not in not_geo_key_variables]
 
     # Now we have to decide if we are going to use the merge
     # strategy or the concat strategy to combine the data frames
@@ -203,11 +285,10 @@ def _download_multiple(
     merge_strategy = True
 
     # But if there are any non-unique keys in any df, we can't
-    # merge.
+    # merge. A boolean duplicated() mask is all we need for that;
+    # there is no need to count how many times each key appears.
     for df_slice in dfs:
-        if len(df_slice.value_counts(geo_key_variables, sort=False)) != len(
-            df_slice.index
-        ):
+        if df_slice.duplicated(subset=geo_key_variables).any():
             merge_strategy = False
             break
 
@@ -216,10 +297,16 @@ def _download_multiple(
 
         __dw_strategy_metrics["merge"] = __dw_strategy_metrics["merge"] + 1
 
-        df_data = dfs[0]
-
-        for df_right in dfs[1:]:
-            df_data = df_data.merge(df_right, on=geo_key_variables)
+        # Since the keys are unique, joining them all on their keys
+        # is the same as an inner merge. But rather than merging them
+        # one at a time, index them all by their keys and line them
+        # all up in a single concat.
+        df_data = pd.concat(
+            [df.set_index(geo_key_variables) for df in dfs],
+            axis="columns",
+            join="inner",
+            copy=False,
+        ).reset_index()
     else:
         # We are going to have to fall back on the concat
         # strategy. Before we do the concat, however, let's
@@ -229,11 +316,12 @@ def _download_multiple(
         # data that should be in different rows.
 
         rows0 = len(dfs[0].index)
+        df_keys0 = dfs[0][geo_key_variables]
 
         for df_slice in dfs[1:]:
             if not (
                 rows0 == len(df_slice.index)
-                and dfs[0][geo_key_variables].equals(df_slice[geo_key_variables])
+                and df_keys0.equals(df_slice[geo_key_variables])
             ):
                 # At least one difference. So we cannot use the
                 # concat strategy either.
@@ -276,6 +364,7 @@ class _ShapefileRoot:
 
 __shapefile_root = _ShapefileRoot()
 __shapefile_readers: Dict[int, cmap.ShapeReader] = {}
+__shapefile_readers_lock = threading.Lock()
 
 
 def set_shapefile_path(shapefile_path: Union[str, None]) -> None:
@@ -292,6 +381,9 @@ def set_shapefile_path(shapefile_path: Union[str, None]) -> None:
     """
     __shapefile_root.shapefile_root = shapefile_path
 
+    # Anything we read from the old path is out of date.
+    clear_shapefile_cache()
+
 
 def get_shapefile_path() -> Union[str, None]:
     """
@@ -308,19 +400,87 @@ def get_shapefile_path() -> Union[str, None]:
 
 
 def __shapefile_reader(year: int):
-    reader = __shapefile_readers.get(year, None)
-
-    if reader is None:
-        reader = cmap.ShapeReader(
-            __shapefile_root.shapefile_root,
-            year,
-        )
+    # We may be called from multiple threads when adding geography
+    # to groups of rows in parallel, so only one of them should
+    # construct the reader.
+    with __shapefile_readers_lock:
+        reader = __shapefile_readers.get(year, None)
+
+        if reader is None:
+            reader = cmap.ShapeReader(
+                __shapefile_root.shapefile_root,
+                year,
+            )
 
-        __shapefile_readers[year] = reader
+            __shapefile_readers[year] = reader
 
     return reader
 
 
+_SHAPEFILE_CACHE_SIZE = 8
+"""
+How many shapefiles :py:func:`~_add_geography` keeps in memory.
+
+Adding geography to data for many states, or doing so repeatedly
+in a notebook, reads the same shapefiles over and over again, so
+we keep a few of the most recently used ones around. Call
+:py:func:`~clear_shapefile_cache` to release them.
+"""
+
+
+@lru_cache(maxsize=_SHAPEFILE_CACHE_SIZE)
+def __read_cb_shapefile_cached(
+    year: int, shapefile_scope: str, shapefile_geo_level: str
+) -> gpd.GeoDataFrame:
+    return __shapefile_reader(year).read_cb_shapefile(
+        shapefile_scope,
+        shapefile_geo_level,
+    )
+
+
+__read_cb_shapefile_locks: DefaultDict[
+    Tuple[int, str, str], threading.Lock
+] = defaultdict(threading.Lock)
+__read_cb_shapefile_locks_lock = threading.Lock()
+
+
+def __read_cb_shapefile(
+    year: int, shapefile_scope: str, shapefile_geo_level: str
+) -> gpd.GeoDataFrame:
+    """
+    Read a cartographic boundary shapefile, or reuse it if we already have.
+
+    The returned data frame is shared, so callers must not modify it.
+    """
+    # lru_cache does not stop several threads that miss on the same
+    # shapefile at the same time from all fetching and reading it,
+    # and they would trip over each other's files on disk. So only
+    # one thread at a time may ask for any given shapefile. The others
+    # wait for it and then find it in the cache.
+    with __read_cb_shapefile_locks_lock:
+        lock = __read_cb_shapefile_locks[(year, shapefile_scope, shapefile_geo_level)]
+
+    with lock:
+        return __read_cb_shapefile_cached(year, shapefile_scope, shapefile_geo_level)
+
+
+def clear_shapefile_cache() -> None:
+    """
+    Clear the shapefiles we have kept in memory.
+
+    When `with_geometry=True` is passed to :py:func:`~download`,
+    recently used shapefiles are kept in memory so they don't have
+    to be read again. This releases them. It is called automatically
+    by :py:func:`~set_shapefile_path`.
+    """
+    __read_cb_shapefile_cached.cache_clear()
+
+    # The readers know where the shapefiles are, so
+    # they have to go too.
+    with __shapefile_readers_lock:
+        __shapefile_readers.clear()
+
+
 _GEO_QUERY_FROM_DATA_QUERY_INNER_GEO: Dict[
     str, Tuple[Optional[str], str, List[str], List[str]]
 ] = {
@@ -377,6 +537,19 @@ to this map.
 """
 
 
+_GEO_QUERY_DF_ON_COLUMN_SETS: List[Tuple[str, FrozenSet[str], str]] = [
+    (k, frozenset(df_on), df_on[-1])
+    for k, (_, _, df_on, _) in _GEO_QUERY_FROM_DATA_QUERY_INNER_GEO.items()
+]
+"""
+The data frame columns for each innermost geo in :py:data:`~_GEO_QUERY_FROM_DATA_QUERY_INNER_GEO`.
+
+For each, we have the name of the innermost geo, the set of columns it
+requires, and the innermost of those columns. This lets :py:func:`~infer_geo_level`
+use set operations on the columns of a data frame rather than searching them.
+"""
+
+
 def _add_geography(
     df_data: pd.DataFrame, year: int, shapefile_scope: str, geo_level: str
 ) -> Union[pd.DataFrame, gpd.GeoDataFrame]:
@@ -424,23 +597,16 @@ def _add_geography(
     # shapefile. If not, then we have to load multiple shapefiles,
     # one per year, and concatenate them.
     if isinstance(year, int):
-        gdf_shapefile = __shapefile_reader(year).read_cb_shapefile(
-            shapefile_scope,
-            shapefile_geo_level,
-        )
+        gdf_shapefile = __read_cb_shapefile(year, shapefile_scope, shapefile_geo_level)
         merge_gdf_on = gdf_on
     else:
         gdf_shapefiles = []
 
         for unique_year in df_data["YEAR"].unique():
             try:
-                gdf_shapefile_for_year = __shapefile_reader(
-                    unique_year
-                ).read_cb_shapefile(
-                    shapefile_scope,
-                    shapefile_geo_level,
-                )
-                gdf_shapefile_for_year["YEAR"] = unique_year
+                gdf_shapefile_for_year = __read_cb_shapefile(
+                    unique_year, shapefile_scope, shapefile_geo_level
+                ).assign(YEAR=unique_year)
                 gdf_shapefiles.append(gdf_shapefile_for_year)
             except cmap.MapException:
                 logger.info("Unable to load shapefile for year %d", unique_year)
@@ -457,18 +623,33 @@ def _add_geography(
         merge_gdf_on = ["YEAR"] + gdf_on
         df_on = ["YEAR"] + df_on
 
-    gdf_data = (
-        gdf_shapefile[merge_gdf_on + ["geometry"]]
-        .merge(df_data, how="right", left_on=merge_gdf_on, right_on=df_on)
-        .drop(gdf_on, axis="columns")
-    )
+    # Index the geometries by the columns we join on, so that each
+    # row of data can look up its geometry directly rather than us
+    # doing a general merge of the shapefile and the data.
+    geometry_lookup = gdf_shapefile.set_index(merge_gdf_on)["geometry"]
 
-    # Rearrange columns so geometry is at the end.
-    gdf_data = gdf_data[
-        [col for col in gdf_data.columns if col != "geometry"] + ["geometry"]
-    ]
+    if geometry_lookup.index.is_unique:
+        gdf_data = df_data.join(geometry_lookup, on=df_on)
+        # Number the rows from zero, as a merge would have.
+        gdf_data.index = pd.RangeIndex(len(gdf_data.index))
+    else:
+        # Some shapefiles have more than one shape for some values of the
+        # key, so we have to merge and end up with a row for each of them.
+        gdf_data = (
+            gdf_shapefile[merge_gdf_on + ["geometry"]]
+            .merge(df_data, how="right", left_on=merge_gdf_on, right_on=df_on)
+            .drop(gdf_on, axis="columns")
+        )
+
+        # Rearrange columns so geometry is at the end.
+        gdf_data = gdf_data[
+            [col for col in gdf_data.columns if col != "geometry"] + ["geometry"]
+        ]
 
-    return gdf_data
+    # Either way, make sure the geometry comes back as a geometry
+    # array in the shapefile's crs, not a column of shapely objects,
+    # so that geometric operations on the result stay vectorized.
+    return gpd.GeoDataFrame(gdf_data, geometry="geometry", crs=gdf_shapefile.crs)
 
 
 def infer_geo_level(df_data: pd.DataFrame) -> str:
@@ -511,13 +692,15 @@ def infer_geo_level(df_data: pd.DataFrame) -> str:
     match_on_len = 0
     partial_match_keys = []
 
-    for k, (_, _, df_on, _) in _GEO_QUERY_FROM_DATA_QUERY_INNER_GEO.items():
-        if all(col in df_data.columns for col in df_on):
+    columns = frozenset(df_data.columns)
+
+    for k, df_on, innermost_col in _GEO_QUERY_DF_ON_COLUMN_SETS:
+        if df_on <= columns:
             # Full match. We want the longest full match
             # we find.
             if match_key is None or len(df_on) > match_on_len:
                 match_key = k
-        elif df_on[-1] in df_data.columns:
+        elif innermost_col in columns:
             # Partial match. This could result in us
             # not getting what we expect. Like if we
             # have STATE and TRACT, but not COUNTY, we will
@@ -586,11 +769,35 @@ def add_inferred_geography(df_data: pd.DataFrame, year: int) -> gpd.GeoDataFrame
     # geography to each group.
     shapefile_scope_column = _GEO_QUERY_FROM_DATA_QUERY_INNER_GEO[geo_level][2][0]
 
-    df_with_geo = (
-        df_data.groupby(shapefile_scope_column, group_keys=False)
-        .apply(lambda g: _add_geography(g, year, g.name, geo_level))
-        .reset_index(drop=True)
-    )
+    groups = list(df_data.groupby(shapefile_scope_column))
+
+    if len(groups) == 0:
+        # No rows, so there is no geography to add.
+        return gpd.GeoDataFrame(df_data.reset_index(drop=True))
+
+    if len(groups) == 1:
+        # Only one shapefile, so nothing to do in parallel.
+        group_scope, df_group = groups[0]
+        dfs_with_geo = [_add_geography(df_group, year, group_scope, geo_level)]
+    else:
+        # Make sure the reader exists before the threads below
+        # all go looking for it.
+        if isinstance(year, int):
+            __shapefile_reader(year)
+
+        # Each group needs its own shapefile, which we may have to
+        # fetch and will have to read, so we do the groups in parallel.
+        # But not too many at once, since each one is a download and
+        # a whole shapefile in memory.
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_DOWNLOADS) as executor:
+            dfs_with_geo = list(
+                executor.map(
+                    lambda group: _add_geography(group[1], year, group[0], geo_level),
+                    groups,
+                )
+            )
+
+    df_with_geo = pd.concat(dfs_with_geo, ignore_index=True)
 
     gdf = gpd.GeoDataFrame(df_with_geo)
 
@@ -646,6 +853,7 @@ def download(
     set_to_nan: Optional[Iterable[int]] = None,
     skip_annotations: bool = True,
     with_geometry: bool = False,
+    downcast: bool = False,
     api_key: Optional[str] = None,
     variable_cache: Optional["VariableCache"] = None,
     **kwargs: cgeo.InSpecType,
@@ -702,6 +910,14 @@ def download(
         a map. See https://www.census.gov/geographies/mapping-files/time-series/geo/cartographic-boundary.2020.html
         for details of the shapefiles that will be downloaded on your behalf to
         generate these boundaries.
+    downcast
+        If `True`, store each numeric variable in the smallest integer or float
+        type that can hold its values, as :py:func:`pd.to_numeric` does with its
+        `downcast` argument. For large downloads this can cut memory use in half
+        or more. But beware that arithmetic on small integer types can overflow
+        and that float variables may be stored as `float32`, with less precision.
+        The default is `False` so that we never change values without the caller
+        explicitly asking us to.
     api_key
         An optional API key. If you don't have or don't use a key, the number
         of calls you can make will be limited.
@@ -715,7 +931,7 @@ def download(
         A :py:class:`~pd.DataFrame` containing the requested US Census data.
     """
     if variable_cache is None:
-        variable_cache = variables
+        variable_cache = _default_variable_cache()
 
     # The side effect here is to prime the cache.
     cgeo.geo_path_snake_specs(dataset, vintage)
@@ -746,6 +962,7 @@ def download(
             key=api_key,
             census_variables=variable_cache,
             with_geometry=with_geometry,
+            downcast=downcast,
             **kwargs,
         )
 
@@ -754,19 +971,34 @@ def download(
     _prefetch_variable_types(dataset, vintage, download_variables, variable_cache)
 
     # If we were given a list, join it together into
-    # a comma-separated string.
-    string_kwargs = {k: _gf2s(v) for k, v in kwargs.items()}
+    # a comma-separated string. If it is a very long list,
+    # we break it into several strings, each of which
+    # will go in a separate query.
+    string_kwargs_chunks = [
+        dict(zip(kwargs.keys(), string_values))
+        for string_values in product(*(_gf2s_chunks(v) for v in kwargs.values()))
+    ]
 
-    return _download_remote(
-        dataset,
-        vintage,
-        download_variables=download_variables,
-        set_to_nan=set_to_nan,
-        with_geometry=with_geometry,
-        api_key=api_key,
-        variable_cache=variable_cache,
-        **string_kwargs,
-    )
+    def download_chunk(string_kwargs: Dict[str, Optional[str]]):
+        return _download_remote(
+            dataset,
+            vintage,
+            download_variables=download_variables,
+            set_to_nan=set_to_nan,
+            with_geometry=with_geometry,
+            downcast=downcast,
+            api_key=api_key,
+            variable_cache=variable_cache,
+            **string_kwargs,
+        )
+
+    if len(string_kwargs_chunks) == 1:
+        return download_chunk(string_kwargs_chunks[0])
+
+    with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_DOWNLOADS) as executor:
+        dfs = list(executor.map(download_chunk, string_kwargs_chunks))
+
+    return pd.concat(dfs, ignore_index=True)
 
 
 def _download_remote(
@@ -776,6 +1008,7 @@ def _download_remote(
     download_variables: List[str],
     set_to_nan: Optional[Iterable[float]] = None,
     with_geometry: bool,
+    downcast: bool = False,
     api_key: Optional[str],
     variable_cache: "VariableCache",
     **kwargs,
@@ -806,6 +1039,9 @@ def _download_remote(
         a map. See https://www.census.gov/geographies/mapping-files/time-series/geo/cartographic-boundary.2020.html
         for details of the shapefiles that will be downloaded on your behalf to
         generate these boundaries.
+    downcast
+        If `True`, store each numeric variable in the smallest type that can
+        hold its values. See :py:func:`~download`.
     api_key
         An optional API key. If you don't have or don't use a key, the number
         of calls you can make will be limited.
@@ -823,10 +1059,11 @@ def _download_remote(
     url, params, bound_path = census_table_url(
         dataset, vintage, download_variables, api_key=api_key, **kwargs
     )
-    df_data = data_from_url(url, params)
+    with __download_slots:
+        df_data = data_from_url(url, params)
 
     # Coerce the types based on metadata about the variables.
-    _coerce_downloaded_variable_types(
+    df_data = _coerce_downloaded_variable_types(
         dataset, vintage, download_variables, df_data, variable_cache
     )
 
@@ -842,6 +1079,11 @@ def _download_remote(
     if set_to_nan is not None:
         df_data = df_data.replace(list(set_to_nan), np.nan)
 
+    # Downcast after NaNing out so that special values are
+    # matched exactly and don't limit how far we can downcast.
+    if downcast:
+        df_data = _downcast_numeric_variables(df_data, download_variables_upper)
+
     if with_geometry:
         # We need to get the geometry and merge it in.
         geo_level = bound_path.path_spec.path[-1]
@@ -853,13 +1095,91 @@ def _download_remote(
     return df_data
 
 
+def _downcast_numeric_variables(
+    df_data: pd.DataFrame, variables: Iterable[str]
+) -> pd.DataFrame:
+    """
+    Store numeric variables in the smallest type that can hold their values.
+
+    Parameters
+    ----------
+    df_data
+        The data.
+    variables
+        The variables (columns) to consider downcasting. Those that are
+        not integer or float are left as they are.
+
+    Returns
+    -------
+        The data with the numeric variables downcast.
+    """
+    downcast_columns = {}
+
+    for variable in variables:
+        column = df_data[variable]
+
+        if pd.api.types.is_integer_dtype(column.dtype):
+            downcast_columns[variable] = pd.to_numeric(column, downcast="integer")
+        elif pd.api.types.is_float_dtype(column.dtype):
+            downcast_columns[variable] = pd.to_numeric(column, downcast="float")
+
+    if not downcast_columns:
+        return df_data
+
+    return df_data.assign(**downcast_columns)
+
+
+def _variable_dtypes(
+    dataset: str,
+    vintage: VintageType,
+    download_variables: List[str],
+    variable_cache: "VariableCache",
+) -> Dict[str, type]:
+    """
+    Determine the type each variable should have based on its metadata.
+
+    Parameters
+    ----------
+    dataset
+        The dataset to download from. For example `"acs/acs5"`,
+        `"dec/pl"`, or `"timeseries/poverty/saipe/schdist"`.
+    vintage
+        The vintage to download data for. For most data sets this is
+        an integer year, for example, `2020`. But for
+        a timeseries data set, pass the string `'timeseries'`.
+    download_variables
+        The census variables to download, for example `["NAME", "B01001_001E"]`.
+    variable_cache
+        A cache of metadata about variables.
+
+    Returns
+    -------
+        A map from variable name to `int` or `float` for each numeric
+        variable. Other variables are left out.
+    """
+    dtypes = {}
+
+    for variable in download_variables:
+        # predicateType does not exist in some older data sets like acs/acs3
+        # So in that case we just go with what we got in the JSON. But if we
+        # have it try to set the type.
+        field_type = variable_cache.predicate_type(dataset, vintage, variable)
+
+        if field_type == "int":
+            dtypes[variable] = int
+        elif field_type == "float":
+            dtypes[variable] = float
+
+    return dtypes
+
+
 def _coerce_downloaded_variable_types(
     dataset: str,
     vintage: VintageType,
     download_variables: List[str],
     df_data: pd.DataFrame,
     variable_cache: "VariableCache",
-) -> None:
+) -> pd.DataFrame:
     """
     Coerce the type of each returned variable (column) in a data frame.
 
@@ -880,37 +1200,116 @@ def _coerce_downloaded_variable_types(
         The data that came back in JSON form from the census API.
     variable_cache
         A cache of metadata about variables.
+
+    Returns
+    -------
+        The data with the types of the columns coerced.
     """
-    for variable in download_variables:
-        # predicateType does not exist in some older data sets like acs/acs3
-        # So in that case we just go with what we got in the JSON. But if we
-        # have it try to set the type.
-        if "predicateType" in variable_cache.get(dataset, vintage, variable):
-            field_type = variable_cache.get(dataset, vintage, variable)["predicateType"]
-
-            if field_type == "int":
-                if df_data[variable].isnull().any():
-                    # Some Census data sets put in null in int fields.
-                    # We have to go with a float to make this a NaN.
-                    # Int has no representation for NaN or None.
-                    df_data[variable] = df_data[variable].astype(float, errors="ignore")
-                else:
-                    try:
-                        df_data[variable] = df_data[variable].astype(int)
-                    except ValueError:
-                        # Sometimes census metadata says int, but they
-                        # put in float values anyway, so fall back on
-                        # trying to get them as floats.
-                        df_data[variable] = df_data[variable].astype(
-                            float, errors="ignore"
-                        )
-            elif field_type == "float":
-                df_data[variable] = df_data[variable].astype(float)
-            elif field_type == "string":
-                pass
-            else:
-                # Leave it as an object?
-                pass
+    # Work out the type we want for each variable first, so
+    # we can convert them all in one pass.
+    dtypes = {}
+    int_variables = set()
+
+    for variable, dtype in _variable_dtypes(
+        dataset, vintage, download_variables, variable_cache
+    ).items():
+        if dtype is int:
+            int_variables.add(variable)
+            if df_data[variable].isnull().any():
+                # Some Census data sets put in null in int fields.
+                # We have to go with a float to make this a NaN.
+                # Int has no representation for NaN or None.
+                dtype = float
+
+        dtypes[variable] = dtype
+
+    if not dtypes:
+        return df_data
+
+    try:
+        return df_data.astype(dtypes)
+    except ValueError:
+        # At least one column did not convert. Fall back on
+        # converting one column at a time so we can deal with
+        # each of them individually.
+        pass
+
+    df_data = df_data.copy()
+
+    for variable, dtype in dtypes.items():
+        if variable in int_variables:
+            try:
+                df_data[variable] = df_data[variable].astype(dtype)
+            except ValueError:
+                # Sometimes census metadata says int, but they
+                # put in float values anyway, so fall back on
+                # trying to get them as floats.
+                df_data[variable] = df_data[variable].astype(float, errors="ignore")
+        else:
+            df_data[variable] = df_data[variable].astype(dtype)
+
+    return df_data
+
+
+_MIN_VARIABLES_TO_PREFETCH_BY_GROUP = 8
+"""
+The number of variables above which we prefetch metadata a group at a time.
+
+Fetching metadata one variable at a time costs a round trip to the census
+API per variable. When many variables are requested, they usually come
+from a small number of groups, so :py:func:`~_prefetch_variable_types` first
+fetches the metadata for each of those groups in a single call each.
+"""
+
+
+def _prefetch_variable_groups(
+    dataset: str,
+    vintage: VintageType,
+    download_variables: List[str],
+    variable_cache: "VariableCache",
+) -> None:
+    """
+    Prefetch metadata for the groups that the variables we want belong to.
+
+    Group names are inferred from the part of the variable name before
+    the first `"_"`, e.g. `"B01001"` for `"B01001_001E"`. Only groups
+    that more than one uncached variable belongs to are fetched. If a
+    group can't be fetched, we quietly move on; the variables in it will
+    be fetched one at a time by the caller.
+
+    Parameters
+    ----------
+    dataset
+        The dataset to download from. For example `"acs/acs5"`,
+        `"dec/pl"`, or `"timeseries/poverty/saipe/schdist"`.
+    vintage
+        The vintage to download data for. For most data sets this is
+        an integer year, for example, `2020`. But for
+        a timeseries data set, pass the string `'timeseries'`.
+    download_variables
+        The census variables to download, for example `["NAME", "B01001_001E"]`.
+    variable_cache
+        A cache of metadata about variables.
+    """
+    uncached_variables_per_group = Counter(
+        variable.split("_")[0]
+        for variable in download_variables
+        if "_" in variable and (dataset, vintage, variable) not in variable_cache
+    )
+
+    for group_name, count in uncached_variables_per_group.items():
+        if count < 2:
+            continue
+        try:
+            # The side effect is to put all the variables in the group in the cache.
+            variable_cache.get_group(dataset, vintage, group_name)
+        except CensusApiException:
+            logger.debug(
+                "Unable to prefetch group %s from dataset %s for vintage %s.",
+                group_name,
+                dataset,
+                vintage,
+            )
 
 
 def _prefetch_variable_types(
@@ -941,6 +1340,9 @@ def _prefetch_variable_types(
     variable_cache
         A cache of metadata about variables.
     """
+    if len(download_variables) > _MIN_VARIABLES_TO_PREFETCH_BY_GROUP:
+        _prefetch_variable_groups(dataset, vintage, download_variables, variable_cache)
+
     for variable in download_variables:
         try:
             variable_cache.get(dataset, vintage, variable)
@@ -1102,4 +1504,47 @@ def census_table_url(
     return url, params, bound_path
 
 
-variables = VariableCache()
+_variables: Optional[VariableCache] = None
+"""
+The default variable cache, created the first time it is needed.
+
+Callers should access it as `censusdis.data.variables`.
+"""
+
+
+def _default_variable_cache() -> VariableCache:
+    """Get the default variable cache, creating it if necessary."""
+    global _variables
+
+    if _variables is None:
+        _variables = VariableCache()
+
+    return _variables
+
+
+def clear_metadata_cache() -> None:
+    """
+    Clear all the metadata about variables and datasets we have cached.
+
+    This clears the default variable cache, `censusdis.data.variables`,
+    in memory, and the metadata cached on disk in the default location.
+    Metadata is cached on disk for up to 30 days. Clear it to see
+    newly released data sets or changed metadata sooner.
+    """
+    if _variables is not None:
+        _variables.clear()
+
+    CensusApiVariableSource().clear_cache()
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Construct module attributes lazily.
+
+    This lets `censusdis.data.variables` be created on first use
+    instead of every time the module is imported.
+    """
+    if name == "variables":
+        return _default_variable_cache()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,14 +8,43 @@ from typing import Any, Mapping, Optional
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from censusdis.impl.exceptions import CensusApiException
 
 logger = getLogger(__name__)
 
 
+_SESSION = requests.Session()
+"""
+The session we make all our calls to the census API through.
+
+Reusing a session lets us reuse connections, rather than paying
+for a new connection and TLS handshake on every call. The pool is
+big enough for the concurrent queries `censusdis.data` makes. Calls
+that fail in ways that are usually transient are retried with a
+backoff. If they still fail, we get the last response back, so
+:py:func:`~json_from_url` can report it.
+"""
+
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+
 def json_from_url(url: str, params: Optional[Mapping[str, str]] = None) -> Any:
-    request = requests.get(url, params=params)
+    request = _SESSION.get(url, params=params)
 
     if request.status_code == 200:
         parsed_json = request.json()
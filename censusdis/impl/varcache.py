@@ -40,6 +40,10 @@ class VariableCache:
             str, DefaultDict[int, Dict[str, Any]]
         ] = defaultdict(lambda: defaultdict(dict))
 
+        # A flat index of the one field of the metadata we look
+        # up for every variable we download.
+        self._predicate_types: Dict[Tuple[str, int, str], Optional[str]] = {}
+
         self._all_data_sets_cache: Optional[pd.DataFrame] = None
         self._data_sets_by_year_cache: Dict[int, pd.DataFrame] = {}
 
@@ -77,10 +81,46 @@ class VariableCache:
 
         value = self._variable_source.get(dataset, year, name)
 
-        self._variable_cache[dataset][year][name] = value
+        self._put(dataset, year, name, value)
 
         return value
 
+    def _put(self, dataset: str, year: int, name: str, value: Dict[str, Any]):
+        """Put the description of a variable in the cache."""
+        self._variable_cache[dataset][year][name] = value
+        self._predicate_types[(dataset, year, name)] = value.get("predicateType", None)
+
+    def predicate_type(self, dataset: str, year: int, name: str) -> Optional[str]:
+        """
+        Get the predicate type of a given variable.
+
+        This is the same as the `"predicateType"` in the description
+        returned by :py:meth:`~get`, but takes a single lookup
+        once the variable is in the cache.
+
+        Parameters
+        ----------
+        dataset
+            The census dataset.
+        year
+            The year
+        name
+            The name of the variable.
+
+        Returns
+        -------
+            The predicate type, for example `"int"`, `"float"`, or
+            `"string"`, or `None` if the metadata for the variable
+            does not have one. This is the case in some older data
+            sets like `acs/acs3`.
+        """
+        key = (dataset, year, name)
+
+        if key not in self._predicate_types:
+            self.get(dataset, year, name)
+
+        return self._predicate_types[key]
+
     def get_group(
         self,
         dataset: str,
@@ -118,7 +158,7 @@ class VariableCache:
             group_variables = value["variables"]
 
             for variable_name, variable_details in group_variables.items():
-                self._variable_cache[dataset][year][variable_name] = variable_details
+                self._put(dataset, year, variable_name, variable_details)
 
             # Cache the names of the variables in the group.
             group_variable_names = list(
@@ -677,6 +717,7 @@ class VariableCache:
 
     def invalidate(self, dataset: str, year: int, name: str):
         """Remove an item from the cache."""
+        self._predicate_types.pop((dataset, year, name), None)
         if self._variable_cache[dataset][year].pop(name, None):
             if len(self._variable_cache[dataset][year]) == 0:
                 self._variable_cache[dataset].pop(year)
@@ -689,5 +730,13 @@ class VariableCache:
 
         This just means that further calls to :py:meth:`~get` will
         have to make a call to the source behind the cache.
+
+        Note that the default source, a
+        :py:class:`~censusdis.impl.varsource.censusapi.CensusApiVariableSource`,
+        keeps its own on-disk cache of metadata for up to 30 days, so this
+        does not necessarily mean a call to the census API. Call its
+        :py:meth:`~censusdis.impl.varsource.censusapi.CensusApiVariableSource.clear_cache`
+        method, or :py:func:`censusdis.data.clear_metadata_cache`, to clear that too.
         """
         self._variable_cache = defaultdict(lambda: defaultdict(dict))
+        self._predicate_types = {}
@@ -3,11 +3,25 @@
 A variable source that loads metadata about variables from the U.S. Census API.
 """
 
+import json
+import os
+import shutil
+import tempfile
+import time
+from logging import getLogger
 from typing import Any, Dict, List, Optional
 
 from censusdis.impl.fetch import json_from_url
 from censusdis.impl.varsource.base import VariableSource
 
+logger = getLogger(__name__)
+
+
+_METADATA_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+"""
+How long, in seconds, metadata cached on disk is used before we fetch it again.
+"""
+
 
 class CensusApiVariableSource(VariableSource):
     """
@@ -16,8 +30,93 @@ class CensusApiVariableSource(VariableSource):
     Users will rarely if ever need to explicitly construct objects
     of this class. There is one behind the singleton cache
     `censusdis.censusdata.variables`.
+
+    The JSON metadata we get from the API is also cached on disk, so
+    that it does not have to be fetched again every time a new process
+    starts up.
+
+    Parameters
+    ----------
+    cache_root
+        The location in the filesystem where metadata is cached.
+        If `None`, `~/.censusdis/data/metadata` is used.
+    use_cache
+        If `False`, always go to the census API and never read
+        or write the on-disk cache.
+    cache_max_age
+        How long, in seconds, cached metadata is used before it
+        is fetched again.
     """
 
+    def __init__(
+        self,
+        cache_root: Optional[str] = None,
+        *,
+        use_cache: bool = True,
+        cache_max_age: float = _METADATA_CACHE_MAX_AGE,
+    ):
+        if cache_root is None:
+            cache_root = os.path.join(
+                os.environ["HOME"], ".censusdis", "data", "metadata"
+            )
+
+        self._cache_root = cache_root
+        self._use_cache = use_cache
+        self._cache_max_age = cache_max_age
+
+    @property
+    def cache_root(self) -> str:
+        """The path at which metadata is cached locally."""
+        return self._cache_root
+
+    def clear_cache(self) -> None:
+        """
+        Remove all the metadata cached on disk.
+
+        Metadata is used from the on-disk cache for up to `cache_max_age`
+        seconds. Clear the cache to fetch it from the census API again
+        sooner, for example to see a newly released vintage in
+        :py:meth:`~get_datasets`.
+        """
+        shutil.rmtree(self._cache_root, ignore_errors=True)
+
+    def _cache_path(self, url: str) -> str:
+        """Helper function to construct the path we cache the JSON at a URL in."""
+        return os.path.join(self._cache_root, *url.split("://", 1)[-1].split("/"))
+
+    def _json_from_url(self, url: str) -> Any:
+        """Fetch JSON from a URL, using the on-disk cache if we can."""
+        if not self._use_cache:
+            return json_from_url(url)
+
+        path = self._cache_path(url)
+
+        try:
+            if time.time() - os.path.getmtime(path) < self._cache_max_age:
+                with open(path, encoding="utf-8") as file:
+                    return json.load(file)
+        except (OSError, ValueError):
+            # Not there, or not readable. Either way
+            # we will go fetch it again.
+            pass
+
+        value = json_from_url(url)
+
+        # Write to a temporary file first and then move it into
+        # place so that nobody ever reads a partially written file.
+        try:
+            dir_path = os.path.dirname(path)
+            os.makedirs(dir_path, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=dir_path, delete=False
+            ) as file:
+                json.dump(value, file)
+            os.replace(file.name, path)
+        except OSError:
+            logger.warning("Unable to cache metadata from %s in %s.", url, path)
+
+        return value
+
     @staticmethod
     def _url_part(dataset: str, year: int):
         if not isinstance(year, int):
@@ -140,7 +239,7 @@ class CensusApiVariableSource(VariableSource):
 
     def get(self, dataset: str, year: int, name: str) -> Dict[str, Any]:
         url = self.url(dataset, year, name)
-        value = json_from_url(url)
+        value = self._json_from_url(url)
 
         return value
 
@@ -148,7 +247,7 @@ class CensusApiVariableSource(VariableSource):
         self, dataset: str, year: int, name: Optional[str]
     ) -> Dict[str, Dict]:
         url = self.group_url(dataset, year, name)
-        value = json_from_url(url)
+        value = self._json_from_url(url)
 
         # Filter out psuedo-variables like 'for' and 'in'.
         value["variables"] = {
@@ -166,7 +265,7 @@ class CensusApiVariableSource(VariableSource):
 
     def get_all_groups(self, dataset: str, year: int) -> Dict[str, List]:
         url = self.all_groups_url(dataset, year)
-        value = json_from_url(url)
+        value = self._json_from_url(url)
 
         return value
 
@@ -176,6 +275,6 @@ class CensusApiVariableSource(VariableSource):
         else:
             url = "https://api.census.gov/data.json"
 
-        json = json_from_url(url)
+        value = self._json_from_url(url)
 
-        return json
+        return value
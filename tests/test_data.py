@@ -1,9 +1,18 @@
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock, patch
+from typing import Any, Dict, List, Optional
 
+import geopandas as gpd
 import pandas as pd
+from shapely.geometry import Point
 
 import censusdis.data as ced
+import censusdis.maps as cmap
 from censusdis import CensusApiException
+from censusdis.impl.varcache import VariableCache
+from censusdis.impl.varsource.base import VariableSource
 
 
 class TestFilters(unittest.TestCase):
@@ -20,6 +29,23 @@ class TestFilters(unittest.TestCase):
         self.assertEqual("013,014", ced._gf2s(["013", "014"]))
         self.assertEqual("013,014,015", ced._gf2s(["013", "014", "015"]))
 
+    def test_filter_chunks(self):
+        self.assertEqual([None], ced._gf2s_chunks(None))
+        self.assertEqual(["013"], ced._gf2s_chunks("013"))
+        self.assertEqual(["013,014"], ced._gf2s_chunks(["013", "014"]))
+
+    def test_filter_chunks_long(self):
+        geo_filter = [f"{ii:06d}" for ii in range(2 * ced._MAX_GEO_FILTER_VALUES + 1)]
+
+        chunks = ced._gf2s_chunks(geo_filter)
+
+        self.assertEqual(3, len(chunks))
+        self.assertEqual(
+            [ced._MAX_GEO_FILTER_VALUES, ced._MAX_GEO_FILTER_VALUES, 1],
+            [len(chunk.split(",")) for chunk in chunks],
+        )
+        self.assertEqual(",".join(geo_filter), ",".join(chunks))
+
 
 class InferGeoTestCase(unittest.TestCase):
     """Test our ability to infer geometry from column names."""
@@ -87,5 +113,630 @@ class InferGeoTestCase(unittest.TestCase):
         self.assertIn("['STATE', 'COUNTY', 'TRACT', 'BLOCK_GROUP']", str(cm.exception))
 
 
+class DowncastTestCase(unittest.TestCase):
+    """Test downcasting numeric variables."""
+
+    def test_downcast(self):
+        df = pd.DataFrame(
+            {
+                "STATE": ["01", "02"],
+                "NAME": ["Alabama", "Alaska"],
+                "B01001_001E": [5024279, 733391],
+                "B01001_002E": [12, 34],
+                "B19013_001E": [52035.0, float("nan")],
+            }
+        )
+
+        df_downcast = ced._downcast_numeric_variables(
+            df, ["NAME", "B01001_001E", "B01001_002E", "B19013_001E"]
+        )
+
+        self.assertEqual("int32", df_downcast["B01001_001E"].dtype)
+        self.assertEqual("int8", df_downcast["B01001_002E"].dtype)
+        self.assertEqual("float32", df_downcast["B19013_001E"].dtype)
+
+        # Values are the same and non-numeric columns are untouched.
+        self.assertEqual([5024279, 733391], list(df_downcast["B01001_001E"]))
+        self.assertEqual(list(df["NAME"]), list(df_downcast["NAME"]))
+        self.assertEqual(list(df["STATE"]), list(df_downcast["STATE"]))
+
+        # The original is not modified.
+        self.assertEqual("int64", df["B01001_001E"].dtype)
+
+
+class PrefetchTestCase(unittest.TestCase):
+    """Test that we prefetch metadata a group at a time when we can."""
+
+    class MockVariableSource(VariableSource):
+        """A mock variable source that counts calls."""
+
+        def __init__(self):
+            self.gets = 0
+            self.group_gets = 0
+
+        def get(self, dataset: str, year: int, name: str) -> Dict[str, Any]:
+            self.gets = self.gets + 1
+            return {"name": name, "label": name, "predicateType": "int"}
+
+        def get_group(
+            self, dataset: str, year: int, name: Optional[str]
+        ) -> Dict[str, Dict]:
+            self.group_gets = self.group_gets + 1
+            if name != "B01001":
+                raise CensusApiException(f"No such group {name}.")
+            return {
+                "variables": {
+                    f"B01001_{ii:03d}E": {
+                        "name": f"B01001_{ii:03d}E",
+                        "label": f"B01001_{ii:03d}E",
+                        "predicateType": "int",
+                    }
+                    for ii in range(1, 50)
+                }
+            }
+
+        def get_all_groups(self, dataset: str, year: int) -> Dict[str, List]:
+            return {"groups": []}
+
+        def get_datasets(self, year: Optional[int]) -> Dict[str, Any]:
+            return {"dataset": []}
+
+    def test_prefetch_by_group(self):
+        source = PrefetchTestCase.MockVariableSource()
+        variable_cache = VariableCache(variable_source=source)
+
+        download_variables = (
+            ["NAME"]
+            + [f"B01001_{ii:03d}E" for ii in range(1, 21)]
+            + ["B99999_001E", "B99999_002E"]
+        )
+
+        ced._prefetch_variable_types(
+            "acs/acs5", 2020, download_variables, variable_cache
+        )
+
+        # One call for each group, then individual calls for NAME and
+        # the two variables in the group that could not be fetched.
+        self.assertEqual(2, source.group_gets)
+        self.assertEqual(3, source.gets)
+        for variable in download_variables:
+            self.assertIn(("acs/acs5", 2020, variable), variable_cache)
+
+    def test_prefetch_few_variables(self):
+        source = PrefetchTestCase.MockVariableSource()
+        variable_cache = VariableCache(variable_source=source)
+
+        download_variables = ["NAME", "B01001_001E", "B01001_002E"]
+
+        ced._prefetch_variable_types(
+            "acs/acs5", 2020, download_variables, variable_cache
+        )
+
+        self.assertEqual(0, source.group_gets)
+        self.assertEqual(3, source.gets)
+
+
+class DefaultVariableCacheTestCase(unittest.TestCase):
+    """Test the lazily constructed default variable cache."""
+
+    def test_variables(self):
+        variables = ced.variables
+
+        self.assertIsInstance(variables, VariableCache)
+        self.assertIs(variables, ced.variables)
+
+    def test_clear_metadata_cache(self):
+        variables = ced.variables
+        variables.clear = MagicMock()
+
+        with patch.object(ced, "CensusApiVariableSource") as source_class:
+            ced.clear_metadata_cache()
+
+        variables.clear.assert_called_once_with()
+        source_class.return_value.clear_cache.assert_called_once_with()
+
+        del variables.clear
+
+    def test_no_such_attribute(self):
+        with self.assertRaises(AttributeError):
+            ced.no_such_attribute
+
+
+class AddInferredGeographyTestCase(unittest.TestCase):
+    """Test adding inferred geography with mocked shapefiles."""
+
+    @staticmethod
+    def read_cb_shapefile(year, shapefile_scope, shapefile_geo_level):
+        # One tract per row, with a point we can recognize
+        # by the state it is in.
+        return gpd.GeoDataFrame(
+            {
+                "STATEFP": [shapefile_scope] * 2,
+                "COUNTYFP": ["001"] * 2,
+                "TRACTCE": ["000100", "000200"],
+                "geometry": [
+                    Point(int(shapefile_scope), 1),
+                    Point(int(shapefile_scope), 2),
+                ],
+            },
+            crs="EPSG:4269",
+        )
+
+    def setUp(self) -> None:
+        patchers = [
+            patch.object(ced, "__read_cb_shapefile", self.read_cb_shapefile),
+            patch.object(ced, "__shapefile_reader", MagicMock()),
+        ]
+
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_multiple_states(self):
+        df = pd.DataFrame(
+            {
+                "STATE": ["34", "01", "34", "02"],
+                "COUNTY": ["001"] * 4,
+                "TRACT": ["000200", "000100", "000100", "000200"],
+                "X": [1, 2, 3, 4],
+            }
+        )
+
+        gdf = ced.add_inferred_geography(df, 2020)
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertEqual("EPSG:4269", gdf.crs)
+
+        # Grouped by state, in the original order within each state.
+        self.assertEqual(list(range(4)), list(gdf.index))
+        self.assertEqual(["01", "02", "34", "34"], list(gdf["STATE"]))
+        self.assertEqual([2, 4, 1, 3], list(gdf["X"]))
+        self.assertEqual(
+            [Point(1, 1), Point(2, 2), Point(34, 2), Point(34, 1)],
+            list(gdf.geometry),
+        )
+
+    def test_one_state(self):
+        df = pd.DataFrame(
+            {
+                "STATE": ["34", "34"],
+                "COUNTY": ["001"] * 2,
+                "TRACT": ["000200", "000100"],
+                "X": [1, 2],
+            }
+        )
+
+        gdf = ced.add_inferred_geography(df, 2020)
+
+        self.assertEqual("EPSG:4269", gdf.crs)
+        self.assertEqual([Point(34, 2), Point(34, 1)], list(gdf.geometry))
+
+    def test_empty(self):
+        df = pd.DataFrame({"STATE": [], "COUNTY": [], "TRACT": [], "X": []})
+
+        gdf = ced.add_inferred_geography(df, 2020)
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertEqual(0, len(gdf.index))
+
+
+class DownloadMultipleTestCase(unittest.TestCase):
+    """Test combining the results of queries for groups of variables."""
+
+    def setUp(self) -> None:
+        self.variables = [
+            f"V{ii:03d}" for ii in range(ced._MAX_VARIABLES_PER_DOWNLOAD + 10)
+        ]
+
+    def mock_download(self, states: List[str]):
+        def download(dataset, vintage, variable_group, **kwargs):
+            # The values encode the row and the variable so we can
+            # tell if any ended up in the wrong place.
+            return pd.DataFrame(
+                {"STATE": states}
+                | {
+                    variable: [
+                        ii * 1000 + int(variable[1:]) for ii in range(len(states))
+                    ]
+                    for variable in variable_group
+                }
+            )
+
+        return patch.object(ced, "download", download)
+
+    def download_multiple(self) -> pd.DataFrame:
+        return ced._download_multiple(
+            "dataset",
+            2020,
+            self.variables,
+            key=None,
+            census_variables=VariableCache(variable_source=MagicMock()),
+            state="*",
+        )
+
+    def assert_expected(self, df):
+        self.assertEqual(["STATE"] + self.variables, list(df.columns))
+        for variable in self.variables:
+            self.assertEqual(
+                [ii * 1000 + int(variable[1:]) for ii in range(len(df.index))],
+                list(df[variable]),
+            )
+
+    def test_merge(self):
+        with self.mock_download(["01", "02", "34"]):
+            df = self.download_multiple()
+
+        self.assertEqual(["01", "02", "34"], list(df["STATE"]))
+        self.assert_expected(df)
+
+    def test_concat(self):
+        # Non-unique keys, so the merge strategy can't be used.
+        with self.mock_download(["01", "01", "34"]):
+            df = self.download_multiple()
+
+        self.assertEqual(["01", "01", "34"], list(df["STATE"]))
+        self.assert_expected(df)
+
+    def test_neither(self):
+        states = [["01", "01", "34"], ["34", "01", "01"]]
+
+        def download(dataset, vintage, variable_group, **kwargs):
+            return pd.DataFrame(
+                {"STATE": states.pop(0)} | {variable: 0 for variable in variable_group}
+            )
+
+        with patch.object(ced, "download", download):
+            with self.assertRaises(CensusApiException):
+                self.download_multiple()
+
+
+class AddGeographyTestCase(unittest.TestCase):
+    """Test adding geography from mocked shapefiles."""
+
+    def setUp(self) -> None:
+        # State shapefiles keyed by year. Each state's point
+        # tells us which year and state it came from.
+        self.shapefiles = {
+            year: gpd.GeoDataFrame(
+                {
+                    "STATEFP": ["01", "02", "34"],
+                    "geometry": [Point(year, 1), Point(year, 2), Point(year, 34)],
+                },
+                crs="EPSG:4269",
+            )
+            for year in [2019, 2020]
+        }
+
+        def read_cb_shapefile(year, shapefile_scope, shapefile_geo_level):
+            self.assertEqual("us", shapefile_scope)
+            self.assertEqual("state", shapefile_geo_level)
+
+            if year not in self.shapefiles:
+                raise cmap.MapException(f"No shapefile for {year}")
+
+            return self.shapefiles[year]
+
+        patcher = patch.object(ced, "__read_cb_shapefile", read_cb_shapefile)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_add_geography(self):
+        df = pd.DataFrame(
+            {"STATE": ["34", "01", "99"], "X": [1, 2, 3]}, index=[5, 6, 7]
+        )
+
+        gdf = ced._add_geography(df, 2020, "us", "state")
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertEqual("EPSG:4269", gdf.crs)
+        self.assertEqual(["STATE", "X", "geometry"], list(gdf.columns))
+        self.assertEqual([0, 1, 2], list(gdf.index))
+        self.assertEqual([1, 2, 3], list(gdf["X"]))
+        self.assertEqual([Point(2020, 34), Point(2020, 1)], list(gdf.geometry[:2]))
+
+        # There is no state 99, so no geometry for it.
+        self.assertEqual([False, False, True], list(gdf.geometry.isna()))
+
+        # The shapefile is shared, so it must not have changed.
+        self.assertEqual(["STATEFP", "geometry"], list(self.shapefiles[2020].columns))
+
+    def test_add_geography_non_unique(self):
+        # Two shapes for state 34, so every row for it gets both.
+        self.shapefiles[2020] = gpd.GeoDataFrame(
+            {
+                "STATEFP": ["01", "34", "34"],
+                "geometry": [Point(1, 1), Point(34, 1), Point(34, 2)],
+            },
+            crs="EPSG:4269",
+        )
+
+        df = pd.DataFrame({"STATE": ["34", "01", "99"], "X": [1, 2, 3]})
+
+        gdf = ced._add_geography(df, 2020, "us", "state")
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertEqual("EPSG:4269", gdf.crs)
+        self.assertEqual(["STATE", "X", "geometry"], list(gdf.columns))
+        self.assertEqual([0, 1, 2, 3], list(gdf.index))
+        self.assertEqual([1, 1, 2, 3], list(gdf["X"]))
+        self.assertEqual(
+            [Point(34, 1), Point(34, 2), Point(1, 1)], list(gdf.geometry[:3])
+        )
+        self.assertEqual([False, False, False, True], list(gdf.geometry.isna()))
+
+    def test_add_geography_multiple_years(self):
+        df = pd.DataFrame(
+            {
+                "YEAR": [2019, 2020, 2020, 2021],
+                "STATE": ["34", "34", "01", "01"],
+                "X": [1, 2, 3, 4],
+            }
+        )
+
+        gdf = ced._add_geography(df, "timeseries", "us", "state")
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertEqual("EPSG:4269", gdf.crs)
+        self.assertEqual(["YEAR", "STATE", "X", "geometry"], list(gdf.columns))
+        self.assertEqual([1, 2, 3, 4], list(gdf["X"]))
+        self.assertEqual(
+            [Point(2019, 34), Point(2020, 34), Point(2020, 1)],
+            list(gdf.geometry[:3]),
+        )
+
+        # There is no shapefile for 2021.
+        self.assertEqual([False, False, False, True], list(gdf.geometry.isna()))
+
+    def test_add_geography_no_years(self):
+        df = pd.DataFrame({"YEAR": [2021], "STATE": ["34"], "X": [1]})
+
+        gdf = ced._add_geography(df, "timeseries", "us", "state")
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertNotIn("geometry", gdf.columns)
+
+
+class ShapefileCacheTestCase(unittest.TestCase):
+    """Test the in-memory cache of shapefiles."""
+
+    def setUp(self) -> None:
+        self.reader = MagicMock()
+        self.reader.read_cb_shapefile.side_effect = lambda scope, level: MagicMock()
+
+        patcher = patch.object(
+            ced, "__shapefile_reader", MagicMock(return_value=self.reader)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        ced.clear_shapefile_cache()
+        self.addCleanup(ced.clear_shapefile_cache)
+        self.addCleanup(ced.set_shapefile_path, ced.get_shapefile_path())
+
+        self.read_cb_shapefile = getattr(ced, "__read_cb_shapefile")
+
+    def test_cache(self):
+        gdf = self.read_cb_shapefile(2020, "us", "state")
+
+        self.assertIs(gdf, self.read_cb_shapefile(2020, "us", "state"))
+        self.assertEqual(1, self.reader.read_cb_shapefile.call_count)
+
+        self.read_cb_shapefile(2020, "34", "tract")
+        self.assertEqual(2, self.reader.read_cb_shapefile.call_count)
+
+    def test_clear(self):
+        gdf = self.read_cb_shapefile(2020, "us", "state")
+
+        ced.clear_shapefile_cache()
+
+        self.assertIsNot(gdf, self.read_cb_shapefile(2020, "us", "state"))
+        self.assertEqual(2, self.reader.read_cb_shapefile.call_count)
+
+    def test_set_shapefile_path(self):
+        gdf = self.read_cb_shapefile(2020, "us", "state")
+
+        ced.set_shapefile_path("/some/other/path")
+
+        self.assertIsNot(gdf, self.read_cb_shapefile(2020, "us", "state"))
+        self.assertEqual(2, self.reader.read_cb_shapefile.call_count)
+
+
+class DownloadGeoFilterChunksTestCase(unittest.TestCase):
+    """Test that download breaks long geographic filters into several queries."""
+
+    def setUp(self) -> None:
+        self.calls = []
+
+        def download_remote(dataset, vintage, *, download_variables, **kwargs):
+            self.calls.append(kwargs)
+            counties = kwargs["county"].split(",")
+            return pd.DataFrame(
+                {
+                    "STATE": kwargs["state"],
+                    "COUNTY": counties,
+                    "X": [int(county) for county in counties],
+                }
+            )
+
+        patchers = [
+            patch.object(ced, "_download_remote", download_remote),
+            patch.object(ced.cgeo, "geo_path_snake_specs", MagicMock()),
+            patch.object(
+                ced.cgeo,
+                "path_component_from_snake",
+                lambda dataset, vintage, component: component,
+            ),
+        ]
+
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.variable_cache = VariableCache(
+            variable_source=PrefetchTestCase.MockVariableSource()
+        )
+
+    def test_download_chunks(self):
+        counties = [f"{ii:03d}" for ii in range(2 * ced._MAX_GEO_FILTER_VALUES + 1)]
+
+        df = ced.download(
+            "dataset",
+            2020,
+            ["X"],
+            variable_cache=self.variable_cache,
+            state="34",
+            county=counties,
+        )
+
+        self.assertEqual(3, len(self.calls))
+        self.assertEqual(
+            sorted(ced._gf2s_chunks(counties)),
+            sorted(call["county"] for call in self.calls),
+        )
+        for call in self.calls:
+            self.assertEqual("34", call["state"])
+
+        # All the results, in the order of the filter values.
+        self.assertEqual(list(range(len(counties))), list(df.index))
+        self.assertEqual(counties, list(df["COUNTY"]))
+        self.assertEqual(list(range(len(counties))), list(df["X"]))
+
+    def test_download_one_chunk(self):
+        df = ced.download(
+            "dataset",
+            2020,
+            ["X"],
+            variable_cache=self.variable_cache,
+            state="34",
+            county=["001", "003"],
+        )
+
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual("001,003", self.calls[0]["county"])
+        self.assertEqual(["001", "003"], list(df["COUNTY"]))
+
+
+class DownloadConcurrencyTestCase(unittest.TestCase):
+    """Test downloads that fan out into concurrent queries."""
+
+    def setUp(self) -> None:
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+        def data_from_url(url, params):
+            with self.lock:
+                self.active = self.active + 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.01)
+            with self.lock:
+                self.active = self.active - 1
+
+            # A row for each value of the filter with more than one.
+            filters = {
+                name.upper(): values.split(",")
+                for name, values in params.items()
+                if name != "variables"
+            }
+            rows = max(len(values) for values in filters.values())
+
+            return pd.DataFrame(
+                {
+                    name: values if len(values) == rows else values * rows
+                    for name, values in filters.items()
+                }
+                | {variable: "1" for variable in params["variables"]}
+            )
+
+        def census_table_url(dataset, vintage, download_variables, **kwargs):
+            kwargs.pop("api_key")
+            bound_path = MagicMock()
+            bound_path.path_spec.path = list(kwargs.keys())
+            bound_path.bindings = kwargs
+            return "url", dict(kwargs, variables=download_variables), bound_path
+
+        # A slow shapefile reader, so that concurrent reads
+        # of the same shapefile would overlap.
+        def read_cb_shapefile(shapefile_scope, shapefile_geo_level):
+            self.shapefile_reads = self.shapefile_reads + 1
+            time.sleep(0.05)
+            return gpd.GeoDataFrame(
+                {
+                    "STATEFP": [f"{ii:04d}" for ii in range(1200)],
+                    "geometry": [Point(ii, ii) for ii in range(1200)],
+                },
+                crs="EPSG:4269",
+            )
+
+        self.shapefile_reads = 0
+        reader = MagicMock()
+        reader.read_cb_shapefile.side_effect = read_cb_shapefile
+
+        patchers = [
+            patch.object(ced, "data_from_url", data_from_url),
+            patch.object(ced, "census_table_url", census_table_url),
+            patch.object(ced, "__shapefile_reader", MagicMock(return_value=reader)),
+            patch.object(ced.cgeo, "geo_path_snake_specs", MagicMock()),
+            patch.object(
+                ced.cgeo,
+                "path_component_from_snake",
+                lambda dataset, vintage, component: component,
+            ),
+        ]
+
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        ced.clear_shapefile_cache()
+        self.addCleanup(ced.clear_shapefile_cache)
+
+        self.variable_cache = VariableCache(
+            variable_source=PrefetchTestCase.MockVariableSource()
+        )
+
+    def test_concurrency_is_bounded(self):
+        # Both many variables and a long filter, so download will
+        # fan out inside of _download_multiple's fan out.
+        variables = [f"V{ii:03d}" for ii in range(4 * ced._MAX_VARIABLES_PER_DOWNLOAD)]
+        counties = [f"{ii:03d}" for ii in range(2 * ced._MAX_GEO_FILTER_VALUES + 1)]
+
+        df = ced.download(
+            "dataset",
+            2020,
+            variables,
+            variable_cache=self.variable_cache,
+            state="34",
+            county=counties,
+        )
+
+        self.assertEqual(len(counties), len(df.index))
+        self.assertEqual(["STATE", "COUNTY"] + variables, list(df.columns))
+        self.assertGreater(self.max_active, 1)
+        self.assertLessEqual(self.max_active, ced._MAX_CONCURRENT_DOWNLOADS)
+
+    def test_with_geometry(self):
+        # A long filter, so the chunks are downloaded concurrently
+        # and each of them needs the same shapefile.
+        states = [f"{ii:04d}" for ii in range(1200)]
+
+        gdf = ced.download(
+            "dataset",
+            2020,
+            ["X"],
+            variable_cache=self.variable_cache,
+            with_geometry=True,
+            state=states,
+        )
+
+        # The shapefile was only read once.
+        self.assertEqual(1, self.shapefile_reads)
+
+        self.assertIsInstance(gdf, gpd.GeoDataFrame)
+        self.assertEqual("EPSG:4269", gdf.crs)
+        self.assertEqual(states, list(gdf["STATE"]))
+        self.assertEqual([Point(ii, ii) for ii in range(1200)], list(gdf.geometry))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+from unittest.mock import MagicMock, patch
 
 import pandas as pd
+from requests.adapters import HTTPAdapter
 
 import censusdis.impl.fetch
 from censusdis import CensusApiException
@@ -38,5 +40,46 @@ class ParseCensusJsonTestCase(unittest.TestCase):
             censusdis.impl.fetch._df_from_census_json([])
 
 
+class SessionTestCase(unittest.TestCase):
+    def test_json_from_url(self):
+        response = MagicMock(status_code=200)
+        response.json.return_value = [["NAME"], ["Alabama"]]
+
+        with patch.object(
+            censusdis.impl.fetch._SESSION, "get", return_value=response
+        ) as get:
+            parsed_json = censusdis.impl.fetch.json_from_url(
+                "https://api.census.gov/data/2020/acs/acs5", {"get": "NAME"}
+            )
+
+        get.assert_called_once_with(
+            "https://api.census.gov/data/2020/acs/acs5", params={"get": "NAME"}
+        )
+        self.assertEqual([["NAME"], ["Alabama"]], parsed_json)
+
+    def test_json_from_url_fails(self):
+        response = MagicMock(status_code=503, url="https://api.census.gov/data")
+
+        with patch.object(censusdis.impl.fetch._SESSION, "get", return_value=response):
+            with self.assertRaises(CensusApiException):
+                censusdis.impl.fetch.json_from_url("https://api.census.gov/data")
+
+    def test_adapter(self):
+        adapter = censusdis.impl.fetch._SESSION.get_adapter(
+            "https://api.census.gov/data"
+        )
+
+        self.assertIsInstance(adapter, HTTPAdapter)
+        self.assertEqual(32, adapter._pool_connections)
+        self.assertEqual(32, adapter._pool_maxsize)
+
+        retry = adapter.max_retries
+
+        self.assertEqual(5, retry.total)
+        self.assertEqual(0.3, retry.backoff_factor)
+        self.assertEqual({429, 500, 502, 503, 504}, set(retry.status_forcelist))
+        self.assertFalse(retry.raise_on_status)
+
+
 if __name__ == "__main__":
     unittest.main()
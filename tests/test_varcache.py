@@ -185,6 +185,31 @@ class VariableCacheTestCase(unittest.TestCase):
         self.assertEqual(0, len(self.variables))
         self.assertNotIn((self.source, self.year, "X01001_001E"), self.variables)
 
+    def test_predicate_type(self):
+        self.assertEqual(
+            "int", self.variables.predicate_type(self.source, self.year, "X01001_001E")
+        )
+        self.assertEqual(1, self.mock_source.gets)
+
+        # Now it comes from the cache.
+        self.assertEqual(
+            "int", self.variables.predicate_type(self.source, self.year, "X01001_001E")
+        )
+        self.assertEqual(1, self.mock_source.gets)
+
+        # Variables that came in with a group are cached too.
+        self.variables.get_group(self.source, self.year, "X02002")
+        self.assertEqual(
+            "int", self.variables.predicate_type(self.source, self.year, "X02002_002E")
+        )
+        self.assertEqual(1, self.mock_source.gets)
+        self.assertEqual(1, self.mock_source.group_gets)
+
+        # Invalidating means we have to go back to the source.
+        self.variables.invalidate(self.source, self.year, "X01001_001E")
+        self.variables.predicate_type(self.source, self.year, "X01001_001E")
+        self.assertEqual(2, self.mock_source.gets)
+
     def test_many_vars(self):
         for n, source in enumerate(["foo/abc", "bar/xyz"]):
             for ii in range(20):
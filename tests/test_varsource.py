@@ -1,4 +1,9 @@
+import json
+import os
+import tempfile
+import time
 import unittest
+from unittest.mock import patch
 
 from censusdis.impl.varsource.censusapi import CensusApiVariableSource
 
@@ -34,5 +39,165 @@ class CensusApiVariableSourceTestCase(unittest.TestCase):
         )
 
 
+class CensusApiVariableSourceCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self._variable_source = CensusApiVariableSource(self._cache_dir.name)
+        self._dataset = "acs/acs5"
+        self._year = 2020
+        self._name = "B01001_001E"
+
+    def tearDown(self) -> None:
+        self._cache_dir.cleanup()
+
+    def _put_in_cache(self, url: str, value) -> str:
+        path = self._variable_source._cache_path(url)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(value, file)
+        return path
+
+    def test_cache_path(self):
+        url = self._variable_source.url(self._dataset, self._year, self._name)
+        path = self._variable_source._cache_path(url)
+
+        self.assertEqual(
+            os.path.join(
+                self._cache_dir.name,
+                "api.census.gov",
+                "data",
+                "2020",
+                "acs",
+                "acs5",
+                "variables",
+                "B01001_001E.json",
+            ),
+            path,
+        )
+
+    def test_get_from_cache(self):
+        cached_value = {"name": self._name, "label": "Estimate!!Total:"}
+
+        self._put_in_cache(
+            self._variable_source.url(self._dataset, self._year, self._name),
+            cached_value,
+        )
+
+        # This would fail if we went to the census API, since
+        # the label there is different.
+        value = self._variable_source.get(self._dataset, self._year, self._name)
+
+        self.assertEqual(cached_value, value)
+
+    def test_get_group_from_cache(self):
+        self._put_in_cache(
+            self._variable_source.group_url(self._dataset, self._year, "B01001"),
+            {
+                "variables": {
+                    self._name: {"label": "Estimate!!Total:"},
+                    "for": {"label": "Census API FIPS 'for' clause"},
+                }
+            },
+        )
+
+        value = self._variable_source.get_group(self._dataset, self._year, "B01001")
+
+        self.assertEqual(
+            {self._name: {"name": self._name, "label": "Estimate!!Total:"}},
+            value["variables"],
+        )
+
+    def _patch_json_from_url(self, value):
+        return patch(
+            "censusdis.impl.varsource.censusapi.json_from_url", return_value=value
+        )
+
+    def test_get_writes_cache(self):
+        fetched_value = {"name": self._name, "label": "Estimate!!Total:"}
+        url = self._variable_source.url(self._dataset, self._year, self._name)
+
+        with self._patch_json_from_url(fetched_value) as json_from_url:
+            value = self._variable_source.get(self._dataset, self._year, self._name)
+
+            json_from_url.assert_called_once_with(url)
+            self.assertEqual(fetched_value, value)
+
+            # The second time it comes from the cache.
+            value = self._variable_source.get(self._dataset, self._year, self._name)
+
+            json_from_url.assert_called_once()
+            self.assertEqual(fetched_value, value)
+
+        path = self._variable_source._cache_path(url)
+
+        with open(path, encoding="utf-8") as file:
+            self.assertEqual(fetched_value, json.load(file))
+
+        # No temporary files were left behind.
+        self.assertEqual([os.path.basename(path)], os.listdir(os.path.dirname(path)))
+
+    def test_get_expired(self):
+        url = self._variable_source.url(self._dataset, self._year, self._name)
+        path = self._put_in_cache(url, {"name": self._name, "label": "Old"})
+
+        # Make the cached copy too old to use.
+        too_old = time.time() - self._variable_source._cache_max_age - 60
+        os.utime(path, (too_old, too_old))
+
+        fetched_value = {"name": self._name, "label": "New"}
+
+        with self._patch_json_from_url(fetched_value) as json_from_url:
+            value = self._variable_source.get(self._dataset, self._year, self._name)
+
+        json_from_url.assert_called_once_with(url)
+        self.assertEqual(fetched_value, value)
+
+        # The cache was refreshed.
+        with open(path, encoding="utf-8") as file:
+            self.assertEqual(fetched_value, json.load(file))
+
+    def test_get_no_cache(self):
+        variable_source = CensusApiVariableSource(self._cache_dir.name, use_cache=False)
+
+        url = variable_source.url(self._dataset, self._year, self._name)
+        self._put_in_cache(url, {"name": self._name, "label": "Cached"})
+
+        fetched_value = {"name": self._name, "label": "Fetched"}
+
+        with self._patch_json_from_url(fetched_value) as json_from_url:
+            value = variable_source.get(self._dataset, self._year, "B01001_002E")
+            self.assertEqual(fetched_value, value)
+
+            value = variable_source.get(self._dataset, self._year, self._name)
+            self.assertEqual(fetched_value, value)
+
+        self.assertEqual(2, json_from_url.call_count)
+
+        # Nothing new was written to the cache.
+        self.assertFalse(
+            os.path.exists(
+                variable_source._cache_path(
+                    variable_source.url(self._dataset, self._year, "B01001_002E")
+                )
+            )
+        )
+
+    def test_clear_cache(self):
+        url = self._variable_source.url(self._dataset, self._year, self._name)
+        path = self._put_in_cache(url, {"name": self._name, "label": "Cached"})
+
+        self._variable_source.clear_cache()
+
+        self.assertFalse(os.path.exists(path))
+
+        fetched_value = {"name": self._name, "label": "Fetched"}
+
+        with self._patch_json_from_url(fetched_value) as json_from_url:
+            value = self._variable_source.get(self._dataset, self._year, self._name)
+
+        json_from_url.assert_called_once_with(url)
+        self.assertEqual(fetched_value, value)
+
+
 if __name__ == "__main__":
     unittest.main()